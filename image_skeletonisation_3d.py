@@ -0,0 +1,293 @@
+'''
+Volumetric (3-D) Skeletonisation with Slab Streaming
+
+Running the 2-D zhangSuen_with_metrics on each Slice of a CT / Microscopy Stack does not give a Topologically Correct 3-D Skeleton.
+This Engine Thins the Volume with 26-Neighborhood Deletion Rules and Streams it Slab by Slab, so Volumes Stored as Memory-Mapped .npy
+Files (e.g. 1024^3) are Thinned within a Fixed Memory Budget
+
+Deletion Rules (Lee, Kashyap and Chu, 1994, Tables in image_skeletonisation_rules.py):
+A Foreground Voxel is Deleted when
+1. It is a Border Voxel in the Current Direction (its 6-Neighbor in that Direction is Background)
+2. It is not an Endpoint (more than one Foreground Voxel in its 26-Neighborhood)
+3. Deleting it keeps the Euler Characteristic (Octant Lookup Tables)
+4. Deleting it keeps a Single 26-Connected Object in its 26-Neighborhood
+Conditions 3 and 4 together make it a Simple Point (Deleting it does not Change the Topology)
+As in Lee et al., all Four Conditions are Checked on the Volume as it was at the Start of a Direction's Round and only the Simple Point
+Test is Repeated when the Voxel is Deleted. Checking Conditions 1 and 2 at Deletion Time instead would Freeze Voxels that only become
+Endpoints Midway through the Round (a Ball would Leave a Star of Arms instead of a Point)
+
+Logic Flow:
+Each Iteration runs 6 Directions x (1 Marking Pass + 8 Subfields) = 54 Passes. The Marking Pass Marks the Voxels that meet all Four
+Conditions, then each Subfield Pass Deletes its Marked Voxels that are still Simple Points. A Subfield holds the Voxels with the Same
+Parity of (Depth, Row, Column), so no two Voxels of a Subfield are 26-Neighbors and they can all be Deleted at once
+The Marks are Kept in Bits 1 to 6 of the Volume (one Bit per Direction, Bit 0 is the Foreground), so they Stream with the Slabs and a
+Skipped Marking Pass keeps the Marks it would have Set. The Volume must therefore have an Integer Dtype. It is Binarized first and the
+Marks are Cleared when Thinning Ends
+A Pass visits the Volume Slab by Slab: a Slab is Read with one Halo Slice on each Side, its Marks or Deletions are Written back, then the
+Next Slab is Read. Because the Deletions of a Pass never Change the Neighborhood of another Voxel of the Same Subfield, Streaming gives
+the Same Skeleton as Thinning the whole Volume at once
+A Slab only needs to be Visited by a Pass if a Voxel in it or its Halo was Deleted since that Pass last ran (the Frontier), so after the
+First Iteration the Slabs away from the Thinning Front are Skipped
+Thinning Stops when an Iteration Deletes Nothing
+
+Memory Budget:
+The Budget is Split between the Slab Window (1 Byte per Voxel), the Candidates of one Slice and a Chunk of Candidates whose
+Neighborhoods are Gathered and Checked at once (slab_plan), so the Peak Working Memory stays under the Budget whatever the Number of
+Candidates. Run the Script with --check-memory to Measure the Peak against the Budget
+
+Space and Time Complexity:
+- O(S * N * M + C) Memory for a Slab of S Slices of N x M Voxels and Chunks of C Candidates (plus O(D) for the Frontier of a Volume
+  with D Slices)
+- O(D * N * M) Time per Pass
+'''
+
+# Importing Libraries
+import argparse
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from image_skeletonisation_rules import NEIGHBOR_OFFSETS_3D, OCTANTS_3D, EULER_OCTANT_TABLES_3D, NEIGHBOR_ADJACENCY_3D
+
+# Border Directions (Depth, Row, Column): Up, Down, North, South, West, East
+DIRECTIONS_3D = [(-1, 0, 0), (1, 0, 0), (0, -1, 0), (0, 1, 0), (0, 0, -1), (0, 0, 1)]
+
+# Subfields: Parity of (Depth, Row, Column)
+SUBFIELDS_3D = [(pz, py, px) for pz in (0, 1) for py in (0, 1) for px in (0, 1)]
+
+# Bit of the Volume that Marks the Candidates of each Direction (Bit 0 is the Foreground)
+MARK_BITS_3D = [2 << d for d in range(len(DIRECTIONS_3D))]
+
+PASSES_PER_ITERATION = len(DIRECTIONS_3D) * (1 + len(SUBFIELDS_3D))  # A Marking Pass and the Subfield Passes per Direction
+
+# Approximate Working Bytes per Voxel of a Slab Window, per Pixel of the Slice being Checked (Masks and Candidate Indices) and per
+# Candidate in a Chunk (Coordinates, Gathered 26-Neighborhood, Euler Codes and int8 Labels)
+BYTES_PER_SLAB_VOXEL = 1
+BYTES_PER_SLICE_PIXEL = 12
+BYTES_PER_CANDIDATE = 512
+MIN_CHUNK_SIZE = 64
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+##__rules__##
+
+# 26-Neighborhoods (K x 26 Booleans, NEIGHBOR_OFFSETS_3D Order) of the Voxels at (z, y, x) of a Padded Window
+def gather_neighbors(window, z, y, x):
+    neighbors = np.empty((len(y), len(NEIGHBOR_OFFSETS_3D)), dtype=bool)
+    for i, (dz, dy, dx) in enumerate(NEIGHBOR_OFFSETS_3D):
+        neighbors[:, i] = window[z + dz, y + dy, x + dx] & 1  # Bit 0 is the Foreground
+    return neighbors
+
+# Conditions 3 and 4: Deleting the Voxel does not Change the Topology
+def simple_point(neighbors):
+    keep = euler_invariant(neighbors)
+    keep[keep] = single_object(neighbors[keep])
+    return keep
+
+# Condition 3: Deleting the Voxel keeps the Euler Characteristic (the 8 Octant Table Values Sum to 4)
+def euler_invariant(neighbors):
+    total = np.zeros(len(neighbors), dtype=np.int16)
+    for (_, members), table in zip(OCTANTS_3D, EULER_OCTANT_TABLES_3D):
+        code = np.zeros(len(neighbors), dtype=np.int16)
+        for bit, member in enumerate(members):
+            code |= neighbors[:, member].astype(np.int16) << bit
+        total += table[code]
+    return total == 4
+
+# Condition 4: the Foreground 26-Neighbors form a Single 26-Connected Object (Label Propagation over the Neighbor Adjacency)
+def single_object(neighbors):
+    background_label = np.int8(len(NEIGHBOR_OFFSETS_3D))
+    own_labels = np.arange(len(NEIGHBOR_OFFSETS_3D), dtype=np.int8)
+    labels = np.where(neighbors, own_labels, background_label)
+    while True:
+        # One Adjacency Column at a Time, so the Temporaries stay K x 26
+        propagated = labels.copy()
+        for column in NEIGHBOR_ADJACENCY_3D.T:
+            np.minimum(propagated, labels[:, column], out=propagated)
+        propagated[~neighbors] = background_label
+        if np.array_equal(propagated, labels):
+            break
+        labels = propagated
+    return (neighbors & (labels == own_labels)).sum(axis=1) == 1
+
+
+##__slabs__##
+
+# Split the Memory Budget: returns (Slices per Slab, Candidates per Chunk)
+def slab_plan(shape, memory_budget=DEFAULT_MEMORY_BUDGET):
+    _, rows, cols = shape
+    slice_pixels = (rows + 2) * (cols + 2)
+    chunk_size = max(MIN_CHUNK_SIZE, memory_budget // 8 // BYTES_PER_CANDIDATE)
+    slab_budget = memory_budget - chunk_size * BYTES_PER_CANDIDATE - slice_pixels * BYTES_PER_SLICE_PIXEL
+    slab_depth = max(1, slab_budget // (slice_pixels * BYTES_PER_SLAB_VOXEL) - 2)  # Two Slices of Halo
+    return slab_depth, chunk_size
+
+# Read the Slab [z0, z1) with one Halo Slice on each Side, Padded with Background (Window Slice w is Volume Slice z0 - 1 + w)
+def read_window(volume, z0, z1):
+    depth, rows, cols = volume.shape
+    window = np.zeros((z1 - z0 + 2, rows + 2, cols + 2), dtype=np.uint8)
+    low, high = max(z0 - 1, 0), min(z1 + 1, depth)
+    window[low - z0 + 1:high - z0 + 1, 1:-1, 1:-1] = volume[low:high]
+    return window
+
+# Window (Row, Column) Coordinates of the Candidates of a Slice Mask, Chunk by Chunk
+def candidate_chunks(mask, chunk_size, step=1, offset=(0, 0)):
+    indices = np.flatnonzero(mask)
+    for start in range(0, len(indices), chunk_size):
+        y, x = np.divmod(indices[start:start + chunk_size], mask.shape[1])
+        yield 1 + offset[0] + step * y, 1 + offset[1] + step * x
+
+# Marking Pass over the Slab [z0, z1): Mark the Voxels that meet all Four Conditions, returning the Condition Checks
+def mark_slab(volume, z0, z1, direction, mark, chunk_size=MIN_CHUNK_SIZE):
+    window = read_window(volume, z0, z1)
+    _, rows, cols = volume.shape
+    dz, dy, dx = direction
+    window &= np.uint8(0xFF ^ mark)  # Marks of the Previous Round
+    condition_checks = 0
+
+    for w in range(1, z1 - z0 + 1):
+        # Condition 1: Foreground Voxels whose Neighbor in the Direction is Background
+        center = window[w, 1:-1, 1:-1]
+        beyond = window[w + dz, 1 + dy:rows + 1 + dy, 1 + dx:cols + 1 + dx]
+        border = (center & 1) > (beyond & 1)
+
+        # Conditions 2, 3 and 4 on a Chunk of Candidates at a Time, each only on the Voxels that Passed the Previous ones
+        for y, x in candidate_chunks(border, chunk_size):
+            condition_checks += len(y)
+            neighbors = gather_neighbors(window, w, y, x)
+            keep = neighbors.sum(axis=1) > 1
+            y, x, neighbors = y[keep], x[keep], neighbors[keep]
+            keep = simple_point(neighbors)
+            window[w, y[keep], x[keep]] |= mark
+
+    volume[z0:z1] = window[1:-1, 1:-1, 1:-1]
+    return condition_checks
+
+# Subfield Pass over the Slab [z0, z1): Delete the Marked Voxels of a Subfield that are still Simple Points, returning the Deletions per
+# Slice and the Condition Checks
+def thin_slab(volume, z0, z1, mark, subfield, chunk_size=MIN_CHUNK_SIZE):
+    window = read_window(volume, z0, z1)
+    _, rows, cols = volume.shape
+    pz, py, px = subfield
+    deleted = np.zeros(z1 - z0, dtype=np.int64)
+    condition_checks = 0
+
+    # Only the Slices of the Subfield's Depth Parity hold Candidates
+    for w in range(1 + (pz - z0) % 2, z1 - z0 + 1, 2):
+        marked = (window[w, 1 + py:rows + 1:2, 1 + px:cols + 1:2] & mark) > 0
+        for y, x in candidate_chunks(marked, chunk_size, step=2, offset=(py, px)):
+            condition_checks += len(y)
+            keep = simple_point(gather_neighbors(window, w, y, x))
+
+            # Write only the Deleted Voxels back (no two Voxels of a Subfield are Neighbors, so the Window needs no Update)
+            volume[z0 - 1 + w, y[keep] - 1, x[keep] - 1] = 0
+            deleted[w - 1] += np.count_nonzero(keep)
+
+    return deleted, condition_checks
+
+# 3-D Thinning of an Integer Volume (ndarray or Memory-Mapped), In-Place, Slab by Slab
+def thinning_3d_with_metrics(volume, slab_depth=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    if not np.issubdtype(volume.dtype, np.integer):
+        raise ValueError(f"3-D thinning keeps its marks in the volume and needs an integer dtype, got {volume.dtype}")
+
+    # Initialize Counters
+    num_iterations = 0
+    total_voxel_updates = 0
+    total_condition_checks = 0
+    slabs_processed = 0
+    slabs_skipped = 0
+    start_time = time.time()
+
+    depth = volume.shape[0]
+    planned_depth, chunk_size = slab_plan(volume.shape, memory_budget)
+    slab_depth = slab_depth or planned_depth
+    last_change = np.full(depth, -PASSES_PER_ITERATION - 1, dtype=np.int64)  # Pass Number of the Last Deletion in each Slice
+    pass_number = 0
+    changing = True
+
+    for z0 in range(0, depth, slab_depth):
+        np.greater(volume[z0:z0 + slab_depth], 0, out=volume[z0:z0 + slab_depth])
+
+    while changing:  # Iterate until no more changes
+        changing = False
+        num_iterations += 1
+
+        for direction, mark in zip(DIRECTIONS_3D, MARK_BITS_3D):
+            for subfield in [None] + SUBFIELDS_3D:  # None is the Marking Pass
+                for z0 in range(0, depth, slab_depth):
+                    z1 = min(z0 + slab_depth, depth)
+
+                    # Frontier: Skip the Slab if Nothing in it or its Halo Changed since this Pass last ran
+                    if num_iterations > 1 and last_change[max(z0 - 1, 0):z1 + 1].max() <= pass_number - PASSES_PER_ITERATION:
+                        slabs_skipped += 1
+                        continue
+
+                    slabs_processed += 1
+                    if subfield is None:
+                        total_condition_checks += mark_slab(volume, z0, z1, direction, mark, chunk_size)
+                        continue
+
+                    deleted, condition_checks = thin_slab(volume, z0, z1, mark, subfield, chunk_size)
+                    total_condition_checks += condition_checks
+                    total_voxel_updates += int(deleted.sum())
+                    if deleted.any():
+                        last_change[z0:z1][deleted > 0] = pass_number
+                        changing = True
+
+                pass_number += 1
+
+    # Clear the Marks
+    for z0 in range(0, depth, slab_depth):
+        volume[z0:z0 + slab_depth] &= 1
+
+    end_time = time.time()
+    time_taken = end_time - start_time
+
+    print(f"Number of iterations: {num_iterations}")
+    print(f"Total voxel updates: {total_voxel_updates}")
+    print(f"Total deletion condition checks: {total_condition_checks}")
+    print(f"Slabs processed: {slabs_processed} (skipped: {slabs_skipped}, slab depth: {slab_depth})")
+    print(f"Total time taken (seconds): {time_taken:.4f}")
+
+    return volume
+
+# Thin a Volume Stored as .npy through a Memory Map, Writing the Skeleton to output_path (or back to input_path)
+def thin_npy(input_path, output_path=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    if output_path is None:
+        volume = np.load(input_path, mmap_mode='r+')
+    else:
+        # Stream a Binarized uint8 Copy of the Input into the Output File, Slab by Slab
+        source = np.load(input_path, mmap_mode='r')
+        volume = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.uint8, shape=source.shape)
+        slab_depth, _ = slab_plan(source.shape, memory_budget)
+        for z0 in range(0, source.shape[0], slab_depth):
+            np.greater(source[z0:z0 + slab_depth], 0, out=volume[z0:z0 + slab_depth])
+
+    thinning_3d_with_metrics(volume, memory_budget=memory_budget)
+    volume.flush()
+    return volume
+
+##__main__##
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="3-D skeletonisation of a .npy volume, streamed slab by slab")
+    parser.add_argument("input", help="Binary volume (.npy, depth x rows x columns)")
+    parser.add_argument("output", nargs="?", help="Output .npy (default: thin the input in place)")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET / (1024 * 1024))
+    parser.add_argument("--check-memory", action="store_true", help="Trace the peak working memory and fail if it exceeds the budget")
+    args = parser.parse_args()
+    memory_budget = int(args.memory_budget_mb * 1024 * 1024)
+
+    if args.check_memory:
+        tracemalloc.start()
+
+    # Applying 3-D Thinning for Volume Skeletonization
+    skeleton = thin_npy(args.input, args.output, memory_budget=memory_budget)
+    print("Skeleton voxels:", int(np.count_nonzero(skeleton)))
+
+    if args.check_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        print(f"Peak working memory: {peak / (1024 * 1024):.1f} MB (budget: {args.memory_budget_mb:g} MB)")
+        if peak > memory_budget:
+            sys.exit(1)
@@ -0,0 +1,219 @@
+'''
+Automatic Engine Selection from a Cheap Cost Model
+
+Which Engine is Fastest depends on the Image Size, Foreground Density, Stroke Thickness and Number of Components. Instead of Guessing,
+the auto Engine Computes a few Cheap Features of the Image and Predicts the Time of every Engine with a Cost Model Calibrated from
+Benchmark Results, then runs the Engine with the Smallest Predicted Time
+
+Features (all O(N * M) with cv2, Negligible next to any Engine):
+- area        : Number of Pixels
+- foreground  : Foreground Fraction
+- boundary    : Boundary Fraction (Foreground Pixels with a Background 8-Neighbor, per Pixel)
+- thickness   : Estimated Maximum Stroke Thickness (2 x Maximum of a Coarse Chessboard Distance Transform)
+- components  : Number of 8-Connected Foreground Components
+
+Cost Model:
+log(time) = w . [1, log(area), log(1 + foreground pixels), log(1 + boundary pixels), log(1 + thickness), log(1 + components)]
+One Weight Vector per Engine, Fitted by (Ridge) Least Squares on Benchmark Timings and Stored in image_skeletonisation_cost_model.json
+
+Usage:
+python image_skeletonisation_auto.py calibrate                 (Benchmark every Engine on Synthetic Masks and Rewrite the Model File)
+python image_skeletonisation_auto.py report image1.png ...     (Predicted and Actual Time per Image, Synthetic Masks if No Paths)
+'''
+
+# Importing Libraries
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+import numpy as np
+import cv2
+
+# Default Location of the Calibrated Cost Model
+COST_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_skeletonisation_cost_model.json')
+
+FEATURE_NAMES = ["bias", "log_area", "log_foreground_pixels", "log_boundary_pixels", "log_thickness", "log_components"]
+
+# Cost Model Loaded from COST_MODEL_PATH on First Use
+_cost_model = None
+
+
+##__features__##
+
+# Cheap Image Features used by the Cost Model
+def image_features(image):
+    foreground = (np.asarray(image) > 0).astype(np.uint8)
+    area = foreground.size
+    foreground_pixels = int(foreground.sum())
+
+    # Boundary Pixels: Foreground Pixels removed by a 3x3 Erosion
+    eroded = cv2.erode(foreground, np.ones((3, 3), dtype=np.uint8), borderType=cv2.BORDER_CONSTANT, borderValue=0)
+    boundary_pixels = foreground_pixels - int(eroded.sum())
+
+    # Coarse (Chessboard) Distance Transform: the Largest Distance to the Background is Half the Thickest Stroke
+    distances = cv2.distanceTransform(foreground, cv2.DIST_C, 3) if foreground_pixels else np.zeros(1)
+    thickness = 2.0 * float(distances.max())
+
+    components = cv2.connectedComponents(foreground, connectivity=8)[0] - 1
+
+    return {
+        "area": area,
+        "foreground": foreground_pixels / area,
+        "boundary": boundary_pixels / area,
+        "thickness": thickness,
+        "components": components,
+    }
+
+# Feature Vector of the Cost Model
+def feature_vector(features):
+    area = features["area"]
+    return np.array([1.0,
+                     np.log(area),
+                     np.log1p(features["foreground"] * area),
+                     np.log1p(features["boundary"] * area),
+                     np.log1p(features["thickness"]),
+                     np.log1p(features["components"])])
+
+
+##__cost_model__##
+
+def load_cost_model(path=COST_MODEL_PATH):
+    with open(path) as model_file:
+        return json.load(model_file)
+
+def save_cost_model(model, path=COST_MODEL_PATH):
+    with open(path, 'w') as model_file:
+        json.dump(model, model_file, indent=2)
+        model_file.write('\n')
+
+def _get_cost_model():
+    global _cost_model
+    if _cost_model is None:
+        _cost_model = load_cost_model()
+    return _cost_model
+
+# Predicted Time (Seconds) of every Engine in the Model for the given Features
+def predict_times(features, model=None, candidates=None):
+    model = model or _get_cost_model()
+    x = feature_vector(features)
+    return {engine: float(np.exp(np.dot(weights, x)))
+            for engine, weights in model["weights"].items()
+            if candidates is None or engine in candidates}
+
+# Engine with the Smallest Predicted Time
+def predict_engine(image, model=None, candidates=None):
+    predictions = predict_times(image_features(image), model=model, candidates=candidates)
+    if not predictions:
+        raise ValueError(f"Cost model has no weights for any of the candidate engines {sorted(candidates or [])}")
+    return min(predictions, key=predictions.get)
+
+# Fit one Weight Vector per Engine from Benchmark Records [(features, {engine: seconds}), ...]
+def fit_cost_model(records, ridge=1e-3):
+    X = np.array([feature_vector(features) for features, _ in records])
+    weights = {}
+    residuals = {}
+    for engine in records[0][1]:
+        y = np.log([timings[engine] for _, timings in records])
+        w = np.linalg.solve(X.T @ X + ridge * np.eye(X.shape[1]), X.T @ y)
+        weights[engine] = [round(float(value), 6) for value in w]
+        residuals[engine] = round(float(np.sqrt(np.mean((X @ w - y) ** 2))), 4)  # RMS Error in log(seconds)
+
+    return {"features": FEATURE_NAMES, "weights": weights, "rms_log_error": residuals, "samples": len(records)}
+
+
+##__benchmark__##
+
+# Synthetic Calibration Masks: Thick Blobs, Thin Lines, Many Dots and Mixtures at several Sizes
+def synthetic_masks(sizes=(32, 64, 100, 160), seeds=(0, 1)):
+    masks = []
+    for size in sizes:
+        for seed in seeds:
+            rng = np.random.default_rng(seed * 1000 + size)
+            for kind in ("blob", "lines", "dots", "mixed"):
+                mask = np.zeros((size, size), dtype=np.uint8)
+                if kind in ("blob", "mixed"):
+                    for _ in range(rng.integers(1, 3)):
+                        center = tuple(int(c) for c in rng.integers(size // 4, 3 * size // 4, 2))
+                        cv2.circle(mask, center, int(rng.integers(size // 8, size // 3)), 1, -1)
+                if kind in ("lines", "mixed"):
+                    for _ in range(rng.integers(2, 6)):
+                        start, end = rng.integers(0, size, 2), rng.integers(0, size, 2)
+                        cv2.line(mask, tuple(int(c) for c in start), tuple(int(c) for c in end), 1, int(rng.integers(1, 4)))
+                if kind in ("dots", "mixed"):
+                    for _ in range(rng.integers(5, 20)):
+                        center = tuple(int(c) for c in rng.integers(2, size - 2, 2))
+                        cv2.circle(mask, center, int(rng.integers(1, max(2, size // 20))), 1, -1)
+                masks.append((f"{kind}_{size}_{seed}", mask.astype(np.int64)))
+    return masks
+
+# Time an Engine on an Image (Best of Repeats, Engine Metrics Suppressed)
+def time_engine(engine_function, image, repeats=1):
+    best = float('inf')
+    for _ in range(repeats):
+        working_image = np.array(image, copy=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            engine_function(working_image)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+# Benchmark every Engine on every Mask and Fit the Cost Model
+def calibrate(engines, masks, repeats=1):
+    records = []
+    for name, mask in masks:
+        timings = {engine: time_engine(function, mask, repeats) for engine, function in engines.items()}
+        records.append((image_features(mask), timings))
+        print(name, " ".join(f"{engine}={seconds:.4f}" for engine, seconds in timings.items()))
+    return fit_cost_model(records)
+
+
+##__main__##
+if __name__ == "__main__":
+    from image_skeletonisation_engines import ENGINES
+
+    parser = argparse.ArgumentParser(description="Cost-model engine selection")
+    parser.add_argument("mode", choices=["calibrate", "report"])
+    parser.add_argument("images", nargs="*", help="Images for report mode (synthetic masks if none)")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--all", action="store_true", help="Report mode: also time every engine, not only the selected one")
+    parser.add_argument("--model", default=COST_MODEL_PATH)
+    args = parser.parse_intermixed_args()  # Image Paths may Follow the Options (report --all a.png)
+
+    candidates = {engine: function for engine, function in ENGINES.items() if engine != "auto"}
+
+    if args.mode == "calibrate":
+        model = calibrate(candidates, synthetic_masks(), repeats=args.repeats)
+        save_cost_model(model, args.model)
+        print("RMS log error per engine:", model["rms_log_error"])
+        print("Saved cost model to", args.model)
+
+    else:
+        # Reading the Images (Resized and Binarized like the Scripts)
+        if args.images:
+            masks = []
+            for image_path in args.images:
+                image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+                image = cv2.resize(image, (100, 100))
+                masks.append((os.path.basename(image_path), np.where(image > 128, 1, 0)))
+        else:
+            masks = synthetic_masks(sizes=(64, 100), seeds=(2,))
+
+        model = load_cost_model(args.model)
+        for name, mask in masks:
+            features = image_features(mask)
+            predictions = predict_times(features, model=model, candidates=candidates)
+            selected = min(predictions, key=predictions.get)
+            timed = candidates if args.all else [selected]
+            actual = {engine: time_engine(candidates[engine], mask, args.repeats) for engine in timed}
+
+            print(f"\nImage: {name} (foreground {features['foreground']:.3f}, boundary {features['boundary']:.3f}, "
+                  f"thickness {features['thickness']:.0f}, components {features['components']})")
+            print(f"{'Engine':>10} {'Predicted (s)':>14} {'Actual (s)':>11}")
+            for engine in sorted(predictions, key=predictions.get):
+                actual_time = f"{actual[engine]:>11.4f}" if engine in actual else f"{'-':>11}"
+                marker = "  <- selected" if engine == selected else ""
+                print(f"{engine:>10} {predictions[engine]:>14.4f} {actual_time}{marker}")
+            if args.all:
+                print("Fastest actual engine:", min(actual, key=actual.get))
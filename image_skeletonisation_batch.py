@@ -0,0 +1,136 @@
+'''
+Image Skeletonisation of Many Small Images at once using a Stacked-Batch Vectorized Zhang-Suen Kernel
+
+Most Masks are Small (100x100, the Size every Script Resizes to), where the Per-Image Python Overhead Dominates. This Kernel Stacks N
+Equally Sized Binary Masks into one 3-D Array (N x Rows x Columns) and runs each Zhang-Suen Sub-Iteration on the whole Stack with
+Single NumPy Operations
+
+Logic Flow:
+Pack the 8-Neighbors of every Interior Pixel of every Image into an 8-Bit Code (Shifted Slices of the Stack) and Delete the Foreground
+Pixels whose Code is Marked in the Zhang-Suen Lookup Table of the Sub-Iteration (image_skeletonisation_rules.py)
+An Image has Converged once an Iteration Deletes Nothing in either Sub-Iteration. Converged Images are Written to the Output and
+Dropped from the Stack, so they stop Costing Work
+
+The Skeletons and the Per-Image Iteration Counts are Identical to running zhangSuen_with_metrics on each Image separately
+
+Space and Time Complexity:
+- O(K * N * M) per Iteration, where K is the Number of Images that have not Converged yet
+'''
+
+# Importing Libraries
+import argparse
+import time
+import numpy as np
+import cv2
+
+from image_skeletonisation_rules import ZHANG_SUEN_TABLES
+from image_skeletonisation_output import SkeletonContainer, SkeletonContainerWriter, save_skeleton
+
+
+# 8-Bit Neighborhood Codes of the Interior Pixels of every Image in the Stack (Bits of P2, P3, P4, P5, P6, P7, P8, P9)
+def neighbourhood_codes(stack):
+    return (stack[:, :-2, 1:-1]
+            | stack[:, :-2, 2:] << 1
+            | stack[:, 1:-1, 2:] << 2
+            | stack[:, 2:, 2:] << 3
+            | stack[:, 2:, 1:-1] << 4
+            | stack[:, 2:, :-2] << 5
+            | stack[:, 1:-1, :-2] << 6
+            | stack[:, :-2, :-2] << 7)
+
+# Stacked-Batch Zhang-Suen Thinning: returns the Skeletons (N x Rows x Columns) and the Number of Iterations of each Image
+def zhangSuen_batch_with_metrics(images):
+    images = [np.asarray(image) for image in images]
+    if not images:
+        raise ValueError("Expected at least one image")
+    shape = images[0].shape
+    if any(image.shape != shape for image in images):
+        raise ValueError(f"All images must have the same shape, got {sorted(set(image.shape for image in images))}")
+
+    # Initialize Counters
+    num_images = len(images)
+    num_iterations = np.zeros(num_images, dtype=np.int64)
+    pixel_updates = np.zeros(num_images, dtype=np.int64)
+    total_condition_checks = 0
+    start_time = time.time()
+
+    stack = (np.stack(images) == 1).astype(np.uint8)
+    skeletons = np.empty_like(stack)
+    active = np.arange(num_images)  # Indices of the Images that have not Converged
+
+    while len(active):
+        num_iterations[active] += 1
+        changed = np.zeros(len(active), dtype=bool)
+
+        for table in ZHANG_SUEN_TABLES:
+            interior = stack[:, 1:-1, 1:-1]
+            deletions = (interior == 1) & table[neighbourhood_codes(stack)]
+            interior[deletions] = 0
+
+            deleted = deletions.sum(axis=(1, 2))
+            pixel_updates[active] += deleted
+            changed |= deleted > 0
+            total_condition_checks += interior.size
+
+        # Write the Converged Images to the Output and Drop them from the Stack
+        if not changed.all():
+            skeletons[active[~changed]] = stack[~changed]
+            stack = stack[changed]
+            active = active[changed]
+
+    end_time = time.time()
+    time_taken = end_time - start_time
+
+    print(f"Number of images: {num_images}")
+    print(f"Maximum number of iterations: {num_iterations.max()}")
+    print(f"Total pixel updates: {pixel_updates.sum()}")
+    print(f"Total Zhang-Suen condition checks: {total_condition_checks}")
+    print(f"Total time taken (seconds): {time_taken:.4f}")
+
+    return skeletons.astype(images[0].dtype), num_iterations
+
+# Skeletonize a Single Image through the Batch Kernel (a Batch of One)
+def batch_traversal(image):
+    skeletons, _ = zhangSuen_batch_with_metrics([image])
+    return skeletons[0]
+
+##__main__##
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stacked-batch Zhang-Suen skeletonisation of many images")
+    parser.add_argument("images", nargs="*", default=['./image.png'])
+    parser.add_argument("--format", choices=["png", "tiff", "skel"], default="png", help="Per-image output file format")
+    parser.add_argument("--container", help="Append all skeletons to this bulk container directory instead of one file per image")
+    args = parser.parse_args()
+    image_paths = list(dict.fromkeys(args.images))
+
+    # Skip the Images already in the Container (Keys are their Paths), so a Re-Run Appends only the New ones
+    if args.container:
+        existing = SkeletonContainer(args.container)
+        skipped = [image_path for image_path in image_paths if image_path in existing]
+        image_paths = [image_path for image_path in image_paths if image_path not in existing]
+        if skipped:
+            print(f"Skipping {len(skipped)} images already in {args.container}: {', '.join(skipped)}")
+        if not image_paths:
+            raise SystemExit(0)
+
+    # Reading the Images
+    images = []
+    for image_path in image_paths:
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        image = cv2.resize(image, (100, 100))
+        images.append(np.where(image > 128, 1, 0))  # Binarize the Image
+
+    # Applying the Stacked-Batch Kernel for Image Skeletonization
+    skeletonized_images, iterations = zhangSuen_batch_with_metrics(images)
+
+    # Saving the Skeletonized Images
+    if args.container:
+        with SkeletonContainerWriter(args.container) as writer:
+            for image_path, skeletonized_image in zip(image_paths, skeletonized_images):
+                writer.append(image_path, skeletonized_image)
+        print(f"Appended {len(images)} skeletons to {args.container}")
+    else:
+        for image_path, skeletonized_image, image_iterations in zip(image_paths, skeletonized_images, iterations):
+            output_path = image_path.rsplit('.', 1)[0] + '_skeletonized.' + args.format
+            print(f"{image_path}: {image_iterations} iterations -> {output_path}")
+            save_skeleton(output_path, skeletonized_image)
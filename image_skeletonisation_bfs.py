@@ -175,24 +175,24 @@ def bfs_traversal(image):
     return image
 
 ##__main__##
-
-# Reading the Image
-image = cv2.imread('./image.png', cv2.IMREAD_GRAYSCALE)
-image = cv2.resize(image, (100, 100))
-image = np.where(image > 128, 1, 0)  # Binarize the Image
-
-# Displaying the Original Image
-plt.imshow(image, cmap='gray')
-plt.title("Original Image")
-plt.show()
-
-# Applying BFS Traversal for Image Skeletonization
-skeletonized_image = bfs_traversal(image)
-
-# Displaying the Skeletonized Image
-plt.imshow(skeletonized_image, cmap='gray')
-plt.title("Skeletonized Image")
-plt.show()
-
-# Saving the Skeletonized Image
-cv2.imwrite('./skeletonized_image.png', skeletonized_image * 255)
\ No newline at end of file
+if __name__ == "__main__":
+    # Reading the Image
+    image = cv2.imread('./image.png', cv2.IMREAD_GRAYSCALE)
+    image = cv2.resize(image, (100, 100))
+    image = np.where(image > 128, 1, 0)  # Binarize the Image
+
+    # Displaying the Original Image
+    plt.imshow(image, cmap='gray')
+    plt.title("Original Image")
+    plt.show()
+
+    # Applying BFS Traversal for Image Skeletonization
+    skeletonized_image = bfs_traversal(image)
+
+    # Displaying the Skeletonized Image
+    plt.imshow(skeletonized_image, cmap='gray')
+    plt.title("Skeletonized Image")
+    plt.show()
+
+    # Saving the Skeletonized Image
+    cv2.imwrite('./skeletonized_image.png', skeletonized_image * 255)
\ No newline at end of file
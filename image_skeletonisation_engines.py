@@ -0,0 +1,87 @@
+'''
+Image Skeletonisation Engine Registry
+
+Collects the Skeletonisation Engines of the Individual Scripts under a Single Name so that Callers (the Local Server, Batch Jobs, Benchmarks)
+can Select an Engine by Name instead of Importing each Script separately
+
+Engines:
+- bfs       : Breadth First Search Traversal (image_skeletonisation_bfs.py)
+- dfs       : Depth First Search Traversal (image_skeletonisation_dfs.py)
+- heuristic : Best First Search Traversal (image_skeletonisation_heuristic.py)
+- matrix    : Zhang-Suen Matrix Implementation (image_skeletonisation_matrix.py)
+- rle       : Zhang-Suen on Run-Length-Encoded Rows, for Sparse Masks (image_skeletonisation_rle.py)
+- batch     : Stacked-Batch Vectorized Zhang-Suen, for Many Small Masks (image_skeletonisation_batch.py)
+- auto      : Runs the Engine with the Smallest Time Predicted by the Cost Model (image_skeletonisation_auto.py)
+
+Every Engine takes a Binary Image (1 -> Foreground / White, 0 -> Background / Black) and returns the Skeletonized Image
+The Input Image is never Modified (the Traversal Engines Thin the Image In-Place, so they are given a Copy)
+skeletonize_many() runs Equally Sized Images of the batch Engine through one Stacked Kernel Call
+'''
+
+# Importing Libraries
+import contextlib
+import io
+import numpy as np
+
+from image_skeletonisation_bfs import bfs_traversal
+from image_skeletonisation_dfs import dfs_traversal
+from image_skeletonisation_heuristic import best_first_search_traversal
+from image_skeletonisation_matrix import zhangSuen_with_metrics
+from image_skeletonisation_rle import rle_traversal
+from image_skeletonisation_batch import batch_traversal, zhangSuen_batch_with_metrics
+from image_skeletonisation_auto import predict_engine
+
+# Engine Name -> Skeletonisation Function
+ENGINES = {
+    "bfs": bfs_traversal,
+    "dfs": dfs_traversal,
+    "heuristic": best_first_search_traversal,
+    "matrix": zhangSuen_with_metrics,
+    "rle": rle_traversal,
+    "batch": batch_traversal,
+}
+
+# Automatic Engine Selection: Predict the Fastest of the other Engines from Cheap Image Features
+def auto_traversal(image):
+    engine = predict_engine(image, candidates=[name for name in ENGINES if name != "auto"])
+    print("Selected engine:", engine)
+    return ENGINES[engine](image)
+
+ENGINES["auto"] = auto_traversal
+
+DEFAULT_ENGINE = "matrix"
+
+# Binarize a Grayscale Image (Foreground -> 1, Background -> 0)
+def binarize(image, threshold=128):
+    return np.where(image > threshold, 1, 0)
+
+# Skeletonize a Binary Image with the Selected Engine
+def skeletonize(image, engine=DEFAULT_ENGINE, quiet=False):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+
+    image = np.array(image, copy=True)  # Engines Modify their Input In-Place
+
+    # The Engines Print their Metrics, which can be Suppressed (e.g. in Server Workers)
+    if quiet:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ENGINES[engine](image)
+    return ENGINES[engine](image)
+
+# Skeletonize a List of Images with the Selected Engine
+def skeletonize_many(images, engine=DEFAULT_ENGINE, quiet=False):
+    if engine != "batch":
+        return [skeletonize(image, engine=engine, quiet=quiet) for image in images]
+
+    # Group the Images by Shape and run each Group through the Stacked Kernel at once
+    groups = {}
+    for index, image in enumerate(images):
+        groups.setdefault(np.shape(image), []).append(index)
+
+    skeletons = [None] * len(images)
+    for indices in groups.values():
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            group_skeletons, _ = zhangSuen_batch_with_metrics([images[index] for index in indices])
+        for index, skeleton in zip(indices, group_skeletons):
+            skeletons[index] = skeleton
+    return skeletons
@@ -0,0 +1,130 @@
+'''
+Load Test for the Local Image Skeletonisation Server
+
+Sends Masks to a Running Server (image_skeletonisation_server.py) from an Increasing Number of Concurrent Clients and Reports the
+p50 / p99 Latency and the Throughput at each Concurrency Level, together with the Server's own Mean Batch Size
+
+The Masks are Synthetic (Random Filled Circles and Rectangles, 100x100 like the Scripts), so no Image Files are Needed
+
+Usage:
+python image_skeletonisation_server.py --port 8765 &
+python image_skeletonisation_loadtest.py --port 8765 --concurrency 1 2 4 8 16 --requests 200
+'''
+
+# Importing Libraries
+import argparse
+import http.client
+import json
+import socket
+import threading
+import time
+import numpy as np
+import cv2
+
+
+# HTTP Connection over a Unix Socket
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=60):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+def connect(args):
+    if args.unix:
+        return UnixHTTPConnection(args.unix)
+    return http.client.HTTPConnection(args.host, args.port, timeout=60)
+
+# Random Binary Mask of Filled Shapes
+def random_mask(rng, size=100):
+    mask = np.zeros((size, size), dtype=np.uint8)
+    for _ in range(rng.integers(1, 4)):
+        center = tuple(int(c) for c in rng.integers(20, size - 20, 2))
+        if rng.random() < 0.5:
+            cv2.circle(mask, center, int(rng.integers(5, 18)), 1, -1)
+        else:
+            half = rng.integers(4, 16, 2)
+            cv2.rectangle(mask, (center[0] - int(half[0]), center[1] - int(half[1])),
+                          (center[0] + int(half[0]), center[1] + int(half[1])), 1, -1)
+    return mask
+
+# Encode the Masks the way a Client would Send them
+def encode_masks(masks, body_format):
+    if body_format == "png":
+        return [("image/png", cv2.imencode(".png", mask * 255)[1].tobytes()) for mask in masks]
+    return [("application/octet-stream", mask.tobytes()) for mask in masks]
+
+# Run one Concurrency Level: each Client Thread Sends its Share of the Requests over a Keep-Alive Connection
+def run_level(args, bodies, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    size = args.size
+    path = f"/skeletonize?engine={args.engine}&rows={size}&cols={size}&format=raw"
+
+    def client(index):
+        connection = connect(args)
+        local = []
+        for request_number in range(index, args.requests, concurrency):
+            content_type, body = bodies[request_number % len(bodies)]
+            start = time.perf_counter()
+            connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+            response = connection.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            if response.status != 200:
+                with lock:
+                    errors.append(response.status)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000.0
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), len(latencies) / elapsed, len(errors)
+
+def fetch_metrics(args):
+    connection = connect(args)
+    connection.request("GET", "/metrics")
+    metrics = json.loads(connection.getresponse().read())
+    connection.close()
+    return metrics
+
+
+##__main__##
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the local image skeletonisation server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Connect to this Unix socket path instead of TCP")
+    parser.add_argument("--engine", default="matrix")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--size", type=int, default=100, help="Mask side length")
+    parser.add_argument("--body", choices=["raw", "png"], default="raw")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    bodies = encode_masks([random_mask(rng, args.size) for _ in range(64)], args.body)
+
+    print(f"Engine: {args.engine}, Mask: {args.size}x{args.size} ({args.body}), Requests per Level: {args.requests}")
+    print(f"{'Concurrency':>11} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Throughput (req/s)':>19} {'Mean Batch':>11} {'Errors':>7}")
+    for concurrency in args.concurrency:
+        before = fetch_metrics(args)
+        p50, p99, throughput, errors = run_level(args, bodies, concurrency)
+        after = fetch_metrics(args)
+
+        batches = after["batches_total"] - before["batches_total"]
+        mean_batch = (after["requests_total"] - before["requests_total"]) / batches if batches else 0.0
+        print(f"{concurrency:>11} {p50:>10.2f} {p99:>10.2f} {throughput:>19.1f} {mean_batch:>11.2f} {errors:>7}")
@@ -10,6 +10,7 @@ By Mohamed Cheriet, Nawwaf Kharma, Cheng-Lin Liu, Ching Suen
 # Importing Libraries
 import numpy as np
 import time
+import cv2
 import matplotlib.pyplot as plt
 from skimage import io
 from skimage.filters import threshold_otsu
@@ -93,51 +94,52 @@ def zhangSuen_with_metrics(image):
     
     return Image_Thinned
 
-# Image Generation and Skeletonization
-image1 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/blob.png"
-image2 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/connectfour.png"
-image3 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/dots.png"
-image4 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/fist.jpeg"
-image5 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/hand.jpeg"
-image6 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/horse.png"
-image7 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/lines.png"
-image8 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/multi_shapes.png"
-image9 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/shape.png"
-image10 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/tree.png"
+if __name__ == "__main__":
+    # Image Generation and Skeletonization
+    image1 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/blob.png"
+    image2 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/connectfour.png"
+    image3 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/dots.png"
+    image4 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/fist.jpeg"
+    image5 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/hand.jpeg"
+    image6 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/horse.png"
+    image7 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/lines.png"
+    image8 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/multi_shapes.png"
+    image9 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/shape.png"
+    image10 = "/Users/ananyashukla/Desktop/Ananya_Shukla/Semester 5/SMAI/tree.png"
 
-# Make a dict to store all image paths
-images = {
-    "blob": image1,
-    "connectfour": image2,
-    "dots": image3,
-    "fist": image4,
-    "hand": image5,
-    "horse": image6,
-    "lines": image7,
-    "multi_shapes": image8,
-    "shape": image9,
-    "tree": image10
-}
+    # Make a dict to store all image paths
+    images = {
+        "blob": image1,
+        "connectfour": image2,
+        "dots": image3,
+        "fist": image4,
+        "hand": image5,
+        "horse": image6,
+        "lines": image7,
+        "multi_shapes": image8,
+        "shape": image9,
+        "tree": image10
+    }
 
-print("Image Skeletonization using BFS Traversal Algorithm")
-# For all images
-for image_name, image_path in images.items():
-    print("\nImage:", image_name)
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    image = cv2.resize(image, (100, 100))
-    image = np.where(image > 127, 1, 0)
+    print("Image Skeletonization using BFS Traversal Algorithm")
+    # For all images
+    for image_name, image_path in images.items():
+        print("\nImage:", image_name)
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        image = cv2.resize(image, (100, 100))
+        image = np.where(image > 127, 1, 0)
 
-    # Displaying the Original Image
-    plt.figure(figsize=(10, 10))
-    plt.subplot(1, 2, 1)
-    plt.title("Original Image")
-    plt.imshow(image, cmap='gray')
+        # Displaying the Original Image
+        plt.figure(figsize=(10, 10))
+        plt.subplot(1, 2, 1)
+        plt.title("Original Image")
+        plt.imshow(image, cmap='gray')
 
-    # Applying Zhang-Suen Thinning Algorithm
-    skeletonized_image = zhangSuen_with_metrics(image)
+        # Applying Zhang-Suen Thinning Algorithm
+        skeletonized_image = zhangSuen_with_metrics(image)
 
-    # Displaying the Skeletonized Image
-    plt.subplot(1, 2, 2)
-    plt.title("Skeletonized Image")
-    plt.imshow(skeletonized_image, cmap='gray')
-    plt.show()
+        # Displaying the Skeletonized Image
+        plt.subplot(1, 2, 2)
+        plt.title("Skeletonized Image")
+        plt.imshow(skeletonized_image, cmap='gray')
+        plt.show()
@@ -0,0 +1,241 @@
+'''
+Compact Skeleton Output Formats and a Bulk Container
+
+The Scripts write skeletonized_image * 255 as an 8-Bit PNG, one File per Image, which is far more Bytes than the few Thousand Skeleton
+Pixels need, and Small-File I/O Dominates Batch Jobs. This Module Writes Skeletons Compactly
+
+Single-File Formats (save_skeleton / load_skeleton, Chosen by Extension):
+- .png          : 1-Bit (Bilevel) PNG
+- .tif / .tiff  : 1-Bit TIFF with CCITT Group 4 Compression
+- .skel         : Sparse Coordinate List (int32 or delta Payload below) after a Small Header: b"SKEL", Encoding, Dtype and Shape
+
+Payload Encodings (Coordinates and Container Entries):
+- packed : np.packbits of the Mask (1 Bit per Pixel)
+- int32  : K x ndim int32 Coordinates of the Skeleton Pixels (Row, Column for Images; Depth, Row, Column for Volumes)
+- delta  : Sorted Row-Major Indices of the Skeleton Pixels as Differences, in the Smallest Unsigned Type that Holds them
+- auto   : The Smaller of packed and delta (Container only)
+
+Bulk Container (SkeletonContainerWriter / SkeletonContainer):
+A Directory with Append-Only Shards (shard-00000.bin, ...) of Concatenated Payloads and an Append-Only index.jsonl with one Line per
+Skeleton (Key, Shard, Offset, Length, Shape, Encoding). Writes are Buffered in Memory and Flushed in Large Appends (the Index Lines are
+Written after their Data, so the Index never Points at Unwritten Bytes). Reads Memory-Map the Shards and Decode a Skeleton by Key
+'''
+
+# Importing Libraries
+import json
+import os
+import struct
+import numpy as np
+import cv2
+from PIL import Image
+
+ENCODINGS = ("packed", "int32", "delta")
+
+# Smallest Unsigned Types for Delta-Encoded Indices
+DELTA_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+# .skel Header: Magic, Encoding Index, Payload Dtype Index, Number of Dimensions, then one uint32 per Dimension
+SKEL_MAGIC = b"SKEL"
+SKEL_HEADER = struct.Struct("<4sBBH")
+SKEL_DTYPES = ("uint8", "uint16", "uint32", "uint64", "int32")
+
+
+##__encodings__##
+
+# Encode a Binary Skeleton as a Payload (Bytes), returning (Payload, Encoding, Dtype of the Payload Elements)
+def encode_skeleton(skeleton, encoding="delta"):
+    mask = np.asarray(skeleton) > 0
+    if encoding == "packed":
+        return np.packbits(mask.ravel()).tobytes(), "packed", "uint8"
+    if encoding == "int32":
+        return np.argwhere(mask).astype(np.int32).tobytes(), "int32", "int32"
+    if encoding == "delta":
+        indices = np.flatnonzero(mask)
+        deltas = np.diff(indices, prepend=0)
+        dtype = next(dtype for dtype in DELTA_DTYPES if not len(deltas) or deltas.max() <= np.iinfo(dtype).max)
+        return deltas.astype(dtype).tobytes(), "delta", np.dtype(dtype).name
+    if encoding == "auto":
+        return min((encode_skeleton(mask, "packed"), encode_skeleton(mask, "delta")), key=lambda encoded: len(encoded[0]))
+    raise ValueError(f"Unknown encoding {encoding!r}, expected one of {list(ENCODINGS) + ['auto']}")
+
+# Decode a Payload back into a Binary Skeleton (uint8, 1 -> Skeleton Pixel)
+def decode_skeleton(payload, shape, encoding, dtype):
+    values = np.frombuffer(payload, dtype=dtype)
+    skeleton = np.zeros(shape, dtype=np.uint8)
+    if encoding == "packed":
+        skeleton.ravel()[:] = np.unpackbits(values, count=skeleton.size)
+    elif encoding == "int32":
+        coordinates = values.reshape(-1, len(shape))
+        skeleton[tuple(coordinates.T)] = 1
+    elif encoding == "delta":
+        skeleton.ravel()[np.cumsum(values, dtype=np.int64)] = 1
+    else:
+        raise ValueError(f"Unknown encoding {encoding!r}, expected one of {list(ENCODINGS)}")
+    return skeleton
+
+
+##__single_files__##
+
+# Save a Skeleton to a Single File, the Format is Chosen by the Extension (.png, .tif / .tiff, .skel)
+def save_skeleton(path, skeleton, encoding="delta"):
+    mask = (np.asarray(skeleton) > 0).astype(np.uint8)
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".png":
+        if not cv2.imwrite(path, mask * 255, [cv2.IMWRITE_PNG_BILEVEL, 1]):
+            raise ValueError(f"Could not write {path}")
+    elif extension in (".tif", ".tiff"):
+        Image.fromarray(mask.astype(bool)).save(path, format="TIFF", compression="group4")
+    elif extension == ".skel":
+        if encoding not in ("int32", "delta"):
+            raise ValueError(f"Coordinate files use the int32 or delta encoding, got {encoding!r}")
+        payload, encoding, dtype = encode_skeleton(mask, encoding)
+        header = SKEL_HEADER.pack(SKEL_MAGIC, ENCODINGS.index(encoding), SKEL_DTYPES.index(dtype), mask.ndim)
+        with open(path, "wb") as skeleton_file:
+            skeleton_file.write(header + struct.pack(f"<{mask.ndim}I", *mask.shape) + payload)
+    else:
+        raise ValueError(f"Unsupported skeleton file extension {extension!r}, expected .png, .tif, .tiff or .skel")
+
+# Load a Skeleton Saved by save_skeleton (uint8, 1 -> Skeleton Pixel)
+def load_skeleton(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".png":
+        return (cv2.imread(path, cv2.IMREAD_GRAYSCALE) > 0).astype(np.uint8)
+    if extension in (".tif", ".tiff"):
+        return np.array(Image.open(path)).astype(np.uint8)
+    if extension == ".skel":
+        with open(path, "rb") as skeleton_file:
+            data = skeleton_file.read()
+        magic, encoding, dtype, ndim = SKEL_HEADER.unpack_from(data)
+        if magic != SKEL_MAGIC:
+            raise ValueError(f"{path} is not a .skel file")
+        shape = struct.unpack_from(f"<{ndim}I", data, SKEL_HEADER.size)
+        payload = data[SKEL_HEADER.size + 4 * ndim:]
+        return decode_skeleton(payload, shape, ENCODINGS[encoding], SKEL_DTYPES[dtype])
+    raise ValueError(f"Unsupported skeleton file extension {extension!r}, expected .png, .tif, .tiff or .skel")
+
+# Encode a Skeleton as a 1-Bit PNG in Memory
+def encode_bilevel_png(skeleton):
+    ok, encoded = cv2.imencode(".png", (np.asarray(skeleton) > 0).astype(np.uint8) * 255, [cv2.IMWRITE_PNG_BILEVEL, 1])
+    if not ok:
+        raise ValueError("Could not encode skeleton as PNG")
+    return encoded.tobytes()
+
+
+##__container__##
+
+def _shard_path(path, shard):
+    return os.path.join(path, f"shard-{shard:05d}.bin")
+
+def _read_index(path):
+    entries = {}
+    index_path = os.path.join(path, "index.jsonl")
+    if os.path.exists(index_path):
+        with open(index_path) as index_file:
+            for line in index_file:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["key"]] = entry
+    return entries
+
+# Buffered, Append-Only Writer of Many Skeletons into a Container Directory
+class SkeletonContainerWriter:
+    def __init__(self, path, encoding="auto", buffer_size=4 * 1024 * 1024, max_shard_bytes=1024 * 1024 * 1024):
+        if encoding not in ENCODINGS + ("auto",):
+            raise ValueError(f"Unknown encoding {encoding!r}, expected one of {list(ENCODINGS) + ['auto']}")
+        self.path = path
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.max_shard_bytes = max_shard_bytes
+        os.makedirs(path, exist_ok=True)
+
+        # Continue Appending after the Existing Entries
+        self.keys = set(_read_index(path))
+        self.shard = 0
+        while os.path.exists(_shard_path(path, self.shard + 1)):
+            self.shard += 1
+        self.shard_size = os.path.getsize(_shard_path(path, self.shard)) if os.path.exists(_shard_path(path, self.shard)) else 0
+
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.pending_entries = []
+
+    # Add a Skeleton under a New Key
+    def append(self, key, skeleton):
+        key = str(key)
+        if key in self.keys:
+            raise ValueError(f"Key {key!r} is already in the container")
+
+        skeleton = np.asarray(skeleton)
+        payload, encoding, dtype = encode_skeleton(skeleton, self.encoding)
+
+        # Start a New Shard when this one would Grow past its Limit
+        if self.shard_size + self.buffered_bytes + len(payload) > self.max_shard_bytes and self.shard_size + self.buffered_bytes > 0:
+            self.flush()
+            self.shard += 1
+            self.shard_size = 0
+
+        self.pending_entries.append({"key": key, "shard": self.shard, "offset": self.shard_size + self.buffered_bytes,
+                                     "length": len(payload), "shape": list(skeleton.shape), "encoding": encoding, "dtype": dtype})
+        self.buffer.append(payload)
+        self.buffered_bytes += len(payload)
+        self.keys.add(key)
+
+        if self.buffered_bytes >= self.buffer_size:
+            self.flush()
+
+    # Write the Buffered Payloads, then their Index Lines
+    def flush(self):
+        if not self.pending_entries:
+            return
+        with open(_shard_path(self.path, self.shard), "ab") as shard_file:
+            shard_file.write(b"".join(self.buffer))
+        with open(os.path.join(self.path, "index.jsonl"), "a") as index_file:
+            index_file.write("".join(json.dumps(entry) + "\n" for entry in self.pending_entries))
+
+        self.shard_size += self.buffered_bytes
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.pending_entries = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Random-Access Reader of a Container Directory (Shards are Memory-Mapped)
+class SkeletonContainer:
+    def __init__(self, path):
+        self.path = path
+        self.index = _read_index(path)
+        self.shards = {}
+
+    def _shard(self, shard, end):
+        # Re-Map a Shard that has Grown since it was Mapped
+        if shard not in self.shards or len(self.shards[shard]) < end:
+            self.shards[shard] = np.memmap(_shard_path(self.path, shard), dtype=np.uint8, mode="r")
+        return self.shards[shard]
+
+    def __getitem__(self, key):
+        entry = self.index[str(key)]
+        start = entry["offset"]
+        end = start + entry["length"]
+        payload = self._shard(entry["shard"], end)[start:end] if entry["length"] else b""
+        return decode_skeleton(payload, tuple(entry["shape"]), entry["encoding"], entry["dtype"])
+
+    def __contains__(self, key):
+        return str(key) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return list(self.index)
+
+    # Pick up Entries Appended since the Container was Opened
+    def refresh(self):
+        self.index = _read_index(self.path)
@@ -0,0 +1,227 @@
+'''
+Image Skeletonisation using Zhang-Suen Thinning on a Run-Length-Encoded (Sparse) Image
+
+Line-Art and Sparse Masks (lines, dots, tree) are mostly Background, yet the Matrix and Traversal Engines walk every Pixel and Store
+the Image as a Dense int64 Array. This Engine Stores each Row as its Foreground Runs and Thins the Image directly on the Runs
+
+Run Representation:
+Each Row is a Flat Sorted List [start0, end0, start1, end1, ...] of Half-Open Foreground Intervals, so a Column c is Foreground
+when bisect_right(row, c) is Odd. An Image is a List of such Rows plus its Shape
+
+Logic Flow:
+Interior Pixels (all 8-Neighbors Foreground) can never be Deleted, so the Candidates of a Row are its Runs minus the Intersection of the
+Eroded Runs of the Row and the Rows Above and Below (Interval Arithmetic, No Pixel Scan)
+Each Candidate is Checked against the Zhang-Suen Lookup Table (image_skeletonisation_rules.py) and the Deletions of a Sub-Iteration are
+Applied together, exactly like zhangSuen_with_metrics, so both Engines produce the Same Skeleton and the Same Number of Iterations
+A Row only needs to be Re-Checked under a Rule if a Pixel in it or an Adjacent Row was Deleted since that Rule was last Applied, so after
+the First Iteration only the Rows around the Deletions (the Frontier) are Visited
+
+Space and Time Complexity:
+- O(R) Space and O(R + B) Time per Sub-Iteration, where R is the Number of Runs and B the Number of Boundary Pixels in the Frontier Rows
+  (Encoding and Decoding a Dense Image is O(N * M))
+'''
+
+# Importing Libraries
+import time
+from bisect import bisect_right
+import numpy as np
+import cv2
+import matplotlib.pyplot as plt
+
+from image_skeletonisation_rules import ZHANG_SUEN_TABLES
+
+
+##__runs__##
+
+# Encode a Dense Binary Image as a List of Rows of Runs (Non-Zero Pixels are Foreground)
+def encode_runs(image):
+    rows, cols = image.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = np.asarray(image) > 0
+
+    # Run Starts and Ends are where the Padded Row Changes Value (np.nonzero returns them in Row-Major, i.e. Sorted, Order)
+    change_rows, change_cols = np.nonzero(np.diff(padded, axis=1))
+    runs = [[] for _ in range(rows)]
+    for x, y in zip(change_rows.tolist(), change_cols.tolist()):
+        runs[x].append(y)
+    return runs
+
+# Decode a List of Rows of Runs back into a Dense Binary Image
+def decode_runs(runs, shape, dtype=np.int64):
+    image = np.zeros(shape, dtype=dtype)
+    for x, row in enumerate(runs):
+        for start, end in zip(row[0::2], row[1::2]):
+            image[x, start:end] = 1
+    return image
+
+# Shrink every Run by one Pixel on both Sides
+def erode_runs(row):
+    eroded = []
+    for start, end in zip(row[0::2], row[1::2]):
+        if end - start > 2:
+            eroded += [start + 1, end - 1]
+    return eroded
+
+# Intersection of two Rows of Runs
+def intersect_runs(a, b):
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i], b[j]), min(a[i + 1], b[j + 1])
+        if start < end:
+            result += [start, end]
+        if a[i + 1] < b[j + 1]:
+            i += 2
+        else:
+            j += 2
+    return result
+
+# Difference of two Rows of Runs (Pixels of a that are not in b)
+def subtract_runs(a, b):
+    result = []
+    j = 0
+    for start, end in zip(a[0::2], a[1::2]):
+        while j < len(b) and b[j + 1] <= start:
+            j += 2
+        k, current = j, start
+        while k < len(b) and b[k] < end:
+            if b[k] > current:
+                result += [current, b[k]]
+            current = max(current, b[k + 1])
+            k += 2
+        if current < end:
+            result += [current, end]
+    return result
+
+# Dense 0/1 List of the Columns [start, end) of a Row of Runs (Columns outside the Image are Background)
+def row_segment(row, start, end):
+    bits = [0] * (end - start)
+    i = bisect_right(row, start)
+    i -= i & 1  # Step back to the Start of the Run containing start (if any)
+    while i < len(row) and row[i] < end:
+        for y in range(max(row[i], start), min(row[i + 1], end)):
+            bits[y - start] = 1
+        i += 2
+    return bits
+
+
+##__thinning__##
+
+# Candidate (Non-Interior) Pixels of Row x, Restricted to the Columns the Matrix Engine Checks (1 to cols - 2)
+def boundary_runs(runs, x, cols):
+    interior = intersect_runs(intersect_runs(erode_runs(runs[x - 1]), erode_runs(runs[x])), erode_runs(runs[x + 1]))
+    return intersect_runs(subtract_runs(runs[x], interior), [1, cols - 1])
+
+# Find the Pixels of the Frontier Rows that the Zhang-Suen Rule (Lookup Table) Deletes
+def find_deletions(runs, frontier, cols, table):
+    deletions = {}
+    condition_checks = 0
+
+    for x in sorted(frontier):
+        candidates = boundary_runs(runs, x, cols)
+        for start, end in zip(candidates[0::2], candidates[1::2]):
+            # Dense Neighborhood of the Candidate Segment (one Column of Halo on each Side)
+            up = row_segment(runs[x - 1], start - 1, end + 1)
+            middle = row_segment(runs[x], start - 1, end + 1)
+            down = row_segment(runs[x + 1], start - 1, end + 1)
+
+            for i in range(1, end - start + 1):
+                # Bits of P2, P3, P4, P5, P6, P7, P8, P9
+                code = (up[i] | up[i + 1] << 1 | middle[i + 1] << 2 | down[i + 1] << 3 |
+                        down[i] << 4 | down[i - 1] << 5 | middle[i - 1] << 6 | up[i - 1] << 7)
+                condition_checks += 1
+                if table[code]:
+                    deletions.setdefault(x, []).append(start + i - 1)
+
+    return deletions, condition_checks
+
+# Delete the Found Pixels from their Rows
+def apply_deletions(runs, deletions):
+    for x, columns in deletions.items():
+        removed = []
+        for y in columns:  # Columns are Sorted, so Adjacent Pixels Merge into one Run
+            if removed and removed[-1] == y:
+                removed[-1] = y + 1
+            else:
+                removed += [y, y + 1]
+        runs[x] = subtract_runs(runs[x], removed)
+
+# Zhang-Suen Thinning Algorithm on Runs (Thins the Runs In-Place)
+def zhangSuen_rle_with_metrics(runs, shape):
+    # Initialize Counters
+    num_iterations = 0
+    total_pixel_updates = 0
+    total_condition_checks = 0
+    max_runs = sum(len(row) for row in runs) // 2
+    start_time = time.time()
+
+    rows, cols = shape
+    all_rows = set(x for x in range(1, rows - 1) if runs[x])
+    changed_history = []  # Rows Changed in each Sub-Iteration so far
+    changing1 = changing2 = True
+
+    while changing1 or changing2:  # Iterate until no more changes
+        num_iterations += 1
+        changes = []
+
+        for table in ZHANG_SUEN_TABLES:
+            # Rows Changed since this Rule was last Applied (in the Previous two Sub-Iterations), Grown by one Row
+            if len(changed_history) < 2:
+                frontier = all_rows
+            else:
+                frontier = set(neighbour for x in changed_history[-1] | changed_history[-2] for neighbour in (x - 1, x, x + 1)
+                               if 1 <= neighbour < rows - 1 and runs[neighbour])
+
+            deletions, condition_checks = find_deletions(runs, frontier, cols, table)
+            apply_deletions(runs, deletions)
+
+            total_condition_checks += condition_checks
+            total_pixel_updates += sum(len(columns) for columns in deletions.values())
+            changed_history.append(set(deletions))
+            changes.append(bool(deletions))
+
+        changing1, changing2 = changes
+        max_runs = max(max_runs, sum(len(row) for row in runs) // 2)
+
+    end_time = time.time()
+    time_taken = end_time - start_time
+
+    print(f"Number of iterations: {num_iterations}")
+    print(f"Total pixel updates: {total_pixel_updates}")
+    print(f"Total Zhang-Suen condition checks: {total_condition_checks}")
+    print(f"Maximum number of runs: {max_runs}")
+    print(f"Total time taken (seconds): {time_taken:.4f}")
+
+    return runs
+
+# Skeletonize a Dense Binary Image through the Run-Length-Encoded Engine
+def rle_traversal(image):
+    runs = zhangSuen_rle_with_metrics(encode_runs(image), image.shape)
+    return decode_runs(runs, image.shape, dtype=image.dtype)
+
+##__main__##
+if __name__ == "__main__":
+    # Reading the Image
+    image = cv2.imread('./image.png', cv2.IMREAD_GRAYSCALE)
+    image = cv2.resize(image, (100, 100))
+    image = np.where(image > 128, 1, 0)  # Binarize the Image
+
+    # Run-Length Encoding and its Size compared to the Dense Image
+    runs = encode_runs(image)
+    print("Number of runs:", sum(len(row) for row in runs) // 2, "for", image.size, "pixels")
+
+    # Displaying the Original Image
+    plt.imshow(image, cmap='gray')
+    plt.title("Original Image")
+    plt.show()
+
+    # Applying Zhang-Suen Thinning on the Runs for Image Skeletonization
+    skeletonized_image = decode_runs(zhangSuen_rle_with_metrics(runs, image.shape), image.shape)
+
+    # Displaying the Skeletonized Image
+    plt.imshow(skeletonized_image, cmap='gray')
+    plt.title("Skeletonized Image")
+    plt.show()
+
+    # Saving the Skeletonized Image
+    cv2.imwrite('./skeletonized_image.png', skeletonized_image * 255)
@@ -0,0 +1,99 @@
+'''
+Zhang-Suen Deletion Rules as Lookup Tables
+
+The Zhang-Suen Conditions only depend on the 8-Neighbors of a Pixel, so they can be Evaluated once for all 256 Neighborhoods and
+Stored in a Table. An Engine then Packs the Neighbors of a Pixel into an 8-Bit Code and Deletes the Pixel if table[code] is True
+
+Neighbor Order (Same as neighbours() in image_skeletonisation_matrix.py and get_8_neighbors() in the Traversal Scripts):
+P9 P2 P3
+P8 P1 P4
+P7 P6 P5
+
+Bit k of the Code is Set when the k-th Neighbor of [P2, P3, P4, P5, P6, P7, P8, P9] is a Foreground Pixel
+
+Sub-Iteration 1: 2 <= N(P1) <= 6, S(P1) == 1, P2 * P4 * P6 == 0, P4 * P6 * P8 == 0
+Sub-Iteration 2: 2 <= N(P1) <= 6, S(P1) == 1, P2 * P4 * P8 == 0, P2 * P6 * P8 == 0
+'''
+
+# Importing Libraries
+import numpy as np
+
+# Count the Number of 0 -> 1 Transitions in the 8-Neighbors of a Pixel
+def transitions(neighbors):
+    n = neighbors + neighbors[0:1]
+    return sum((n1, n2) == (0, 1) for n1, n2 in zip(n, n[1:]))
+
+# Unpack an 8-Bit Neighborhood Code into [P2, P3, P4, P5, P6, P7, P8, P9]
+def decode_neighbors(code):
+    return [(code >> bit) & 1 for bit in range(8)]
+
+# Build the Deletion Table of a Sub-Iteration (1 or 2)
+def zhang_suen_table(sub_iteration):
+    table = np.zeros(256, dtype=bool)
+    for code in range(256):
+        P2, P3, P4, P5, P6, P7, P8, P9 = n = decode_neighbors(code)
+        if sub_iteration == 1:
+            directional = P2 * P4 * P6 == 0 and P4 * P6 * P8 == 0
+        else:
+            directional = P2 * P4 * P8 == 0 and P2 * P6 * P8 == 0
+        table[code] = 2 <= sum(n) <= 6 and transitions(n) == 1 and directional
+    return table
+
+# Both Sub-Iteration Tables, Built once at Import
+ZHANG_SUEN_TABLES = (zhang_suen_table(1), zhang_suen_table(2))
+
+
+##__3d__##
+
+'''
+3-D Deletion Rules (26-Neighborhood, Used by image_skeletonisation_3d.py)
+
+A Voxel can be Deleted without Changing the Topology (a Simple Point) when Deleting it Keeps the Euler Characteristic and the Number of
+26-Connected Objects in its 3x3x3 Neighborhood (Lee, Kashyap and Chu, 1994)
+
+Euler Invariance:
+Treating Voxels as Closed Unit Cubes, Deleting P keeps the Euler Characteristic iff the Part of the Surface of P Shared with the other
+Foreground Voxels has Euler Characteristic V - E + F == 1 (Shared Corners, Edges and Faces of P)
+Each of the 8 Octants (2x2x2 Blocks with P at a Corner) owns one Corner, Half of three Edges and a Quarter of three Faces of P, so the
+Count Splits into a 128-Entry Table per Octant (in Quarter Units) indexed by its 7 Neighbors, and P is Euler-Invariant iff the 8 Octant
+Values Sum to 4
+'''
+
+# (Depth, Row, Column) Offsets of the 26 Neighbors
+NEIGHBOR_OFFSETS_3D = [(dz, dy, dx) for dz in (-1, 0, 1) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dz, dy, dx) != (0, 0, 0)]
+
+# The 7 Neighbors of P in the Octant with the given Signs
+def octant_members(signs):
+    sz, sy, sx = signs
+    return [(dz, dy, dx) for dz in (0, sz) for dy in (0, sy) for dx in (0, sx) if (dz, dy, dx) != (0, 0, 0)]
+
+# Octants: (Signs, Indices into NEIGHBOR_OFFSETS_3D of its 7 Neighbors)
+OCTANTS_3D = [((sz, sy, sx), [NEIGHBOR_OFFSETS_3D.index(member) for member in octant_members((sz, sy, sx))])
+              for sz in (-1, 1) for sy in (-1, 1) for sx in (-1, 1)]
+
+# Euler Contribution (in Quarter Units) of an Octant, Bit k of the Code is its k-th Neighbor in octant_members() Order
+def euler_octant_table(signs):
+    sz, sy, sx = signs
+    members = octant_members(signs)
+    edges = [[(sz, 0, 0), (0, sy, 0), (sz, sy, 0)],    # Edge of P along the Column Axis
+             [(sz, 0, 0), (0, 0, sx), (sz, 0, sx)],    # Edge of P along the Row Axis
+             [(0, sy, 0), (0, 0, sx), (0, sy, sx)]]    # Edge of P along the Depth Axis
+    faces = [[(sz, 0, 0)], [(0, sy, 0)], [(0, 0, sx)]]
+
+    table = np.zeros(128, dtype=np.int8)
+    for code in range(128):
+        present = set(member for bit, member in enumerate(members) if (code >> bit) & 1)
+        shared = lambda voxels: any(voxel in present for voxel in voxels)
+        table[code] = 4 * shared(members) - 2 * sum(map(shared, edges)) + sum(map(shared, faces))
+    return table
+
+EULER_OCTANT_TABLES_3D = [euler_octant_table(signs) for signs, _ in OCTANTS_3D]
+
+# 26-Adjacency between the 26 Neighbors (each Row Padded with the Neighbor's own Index)
+def neighbor_adjacency_3d():
+    adjacency = [[j for j, other in enumerate(NEIGHBOR_OFFSETS_3D)
+                  if max(abs(a - b) for a, b in zip(offset, other)) == 1] for offset in NEIGHBOR_OFFSETS_3D]
+    width = max(len(row) for row in adjacency)
+    return np.array([row + [i] * (width - len(row)) for i, row in enumerate(adjacency)])
+
+NEIGHBOR_ADJACENCY_3D = neighbor_adjacency_3d()
@@ -0,0 +1,422 @@
+'''
+Local Image Skeletonisation Server with Warm Workers and Request Micro-Batching
+
+Running a Script per Image pays the Python, NumPy, cv2 and matplotlib Start-Up Cost every Time. This Server is Started Once and keeps
+a Pool of Pre-Warmed Worker Processes (with the Engines already Imported and Exercised) that Skeletonize the Masks sent to it over HTTP,
+either on localhost or on a Unix Socket
+
+Logic Flow:
+Each HTTP Request is Decoded into a Binary Mask and put on a Pending Queue, the Request Thread then Waits for its Result
+A Batcher Thread Waits for a Free Worker, takes the First Pending Request and keeps Collecting Requests until the Batch is Full or the
+Batching Window has Passed, then Sends the whole Batch to the Worker in a Single Round Trip
+Under Light Load a Batch holds a Single Request (No Added Latency beyond the Window), under Heavy Load Batches Grow while Workers are Busy
+
+Endpoints:
+- POST /skeletonize : Body is a PNG (Content-Type: image/png) or Raw 8-Bit Mask Bytes (Content-Type: application/octet-stream)
+                      Query Parameters:
+                      engine = bfs | dfs | heuristic | matrix | rle | batch | auto (Default: matrix)
+                               (Concurrent batch Requests of the Same Shape are Thinned in one Stacked Kernel Call)
+                      rows, cols = Shape of a Raw Mask (Required for Raw Bytes)
+                      resize = Side Length to Resize a PNG to before Binarizing (Optional, the Scripts use 100)
+                      format = png | raw (Response Format: 1-Bit PNG or one uint8 per Pixel, Default: png)
+- GET /metrics      : JSON with Latency Percentiles, Queue Depth, Request / Batch / Time-Out Counters
+                      (A Batch whose Worker does not Return within --request-timeout Seconds is Answered with 503)
+- GET /health       : Liveness Check
+
+Usage:
+python image_skeletonisation_server.py --port 8765 --workers 4
+python image_skeletonisation_server.py --unix /tmp/skeletonisation.sock
+'''
+
+# Importing Libraries
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import cv2
+
+from image_skeletonisation_engines import DEFAULT_ENGINE, ENGINES, binarize, skeletonize, skeletonize_many
+from image_skeletonisation_output import encode_bilevel_png
+
+# Number of Latencies Kept for the Percentile Metrics
+LATENCY_WINDOW = 10000
+
+# A Batch that has not Returned after this many Seconds is Failed (its Worker may have Died, e.g. Killed when Out of Memory)
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+# Raised for the Requests of a Batch whose Worker did not Return in Time
+class WorkerTimeoutError(Exception):
+    pass
+
+
+##__worker__##
+
+# Worker Initializer: Import and Exercise every Engine once so the First Real Request does not pay the Warm-Up Cost
+def _warm_worker():
+    warm_up_image = np.zeros((16, 16), dtype=np.int64)
+    warm_up_image[4:12, 4:12] = 1
+    for engine in ENGINES:
+        skeletonize(warm_up_image, engine=engine, quiet=True)
+
+# Skeletonize a Batch of (Image, Engine) Pairs in a Worker, returning (Skeleton, Error) per Image so one Bad Request does not Fail the Batch
+def _skeletonize_batch(batch):
+    results = [None] * len(batch)
+
+    # Requests for the batch Engine are Stacked and Thinned Together
+    stacked = [index for index, (_, engine) in enumerate(batch) if engine == "batch"]
+    if stacked:
+        try:
+            skeletons = skeletonize_many([batch[index][0] for index in stacked], engine="batch", quiet=True)
+            for index, skeleton in zip(stacked, skeletons):
+                results[index] = (skeleton.astype(np.uint8), None)
+        except Exception:
+            pass  # Fall back to one Image at a time, so the Error is Reported only for the Bad Request
+
+    for index, (image, engine) in enumerate(batch):
+        if results[index] is not None:
+            continue
+        try:
+            results[index] = (skeletonize(image, engine=engine, quiet=True).astype(np.uint8), None)
+        except Exception as error:
+            results[index] = (None, f"{type(error).__name__}: {error}")
+    return results
+
+
+##__batcher__##
+
+# Collects Pending Requests into Batches and Dispatches them to the Worker Pool
+class MicroBatcher:
+    def __init__(self, workers, max_batch_size=16, max_wait=0.002, request_timeout=DEFAULT_REQUEST_TIMEOUT):
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.request_timeout = request_timeout
+        self.pool = multiprocessing.Pool(workers, initializer=_warm_worker)
+
+        self.pending = queue.Queue()
+        self.free_workers = threading.Semaphore(workers)  # One Batch in Flight per Worker
+        self.lock = threading.Lock()
+
+        # In-Flight Batches by Id: (Deadline, Batch). Every Batch gets the Same Time Out, so Insertion Order is Deadline Order
+        self.watched = {}
+        self.watch = threading.Condition()
+        self.batch_ids = itertools.count()
+        self.closing = False
+
+        # Metrics
+        self.start_time = time.time()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.in_flight = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.timeouts_total = 0
+        self.batches_total = 0
+        self.batched_requests_total = 0
+
+        self.thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.thread.start()
+        self.watchdog = threading.Thread(target=self._watch, name="batch-watchdog", daemon=True)
+        self.watchdog.start()
+
+    # Enqueue a Mask and return a Future for its Skeleton
+    def submit(self, image, engine=DEFAULT_ENGINE):
+        future = Future()
+        self.pending.put((image, engine, future, time.perf_counter()))
+        return future
+
+    # Batcher Loop: Wait for a Free Worker, then Collect a Batch within the Batching Window
+    def _run(self):
+        while True:
+            self.free_workers.acquire()
+            first = self.pending.get()
+            if first is None:  # Shutdown Sentinel
+                self.free_workers.release()
+                return
+
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.pending.put(None)  # Let the Outer Loop see the Sentinel after this Batch
+                    break
+                batch.append(item)
+
+            self._dispatch(batch)
+
+    # Send a Batch to the Pool and Resolve the Futures when it Returns (or when the Watchdog Times it Out)
+    def _dispatch(self, batch):
+        with self.lock:
+            self.in_flight += len(batch)
+            self.batches_total += 1
+            self.batched_requests_total += len(batch)
+
+        batch_id = next(self.batch_ids)
+        with self.watch:
+            self.watched[batch_id] = (time.perf_counter() + self.request_timeout, batch)
+            self.watch.notify()
+
+        def on_done(results):
+            self._resolve(batch_id, batch, results, ValueError)
+
+        def on_error(error):
+            self._resolve(batch_id, batch, [(None, f"{type(error).__name__}: {error}")] * len(batch), ValueError)
+
+        payload = [(image, engine) for image, engine, _, _ in batch]
+        self.pool.apply_async(_skeletonize_batch, (payload,), callback=on_done, error_callback=on_error)
+
+    # Watchdog Loop: a Pool whose Worker Dies Mid-Batch never calls either Callback, so Batches past their Deadline are Failed here,
+    # which Frees their Requests and their Worker Slot
+    def _watch(self):
+        while True:
+            with self.watch:
+                expired = []
+                while not expired:
+                    if self.closing:
+                        return
+                    now = time.perf_counter()
+                    for batch_id, (deadline, batch) in self.watched.items():
+                        if deadline > now:
+                            break
+                        expired.append((batch_id, batch))
+                    if not expired:
+                        # Sleep until the Oldest Deadline (or until a Batch is Dispatched into an Empty Watch)
+                        self.watch.wait(next(iter(self.watched.values()))[0] - now if self.watched else None)
+
+            message = f"Worker did not return within {self.request_timeout:g} seconds"
+            for batch_id, batch in expired:
+                if self._resolve(batch_id, batch, [(None, message)] * len(batch), WorkerTimeoutError):
+                    with self.lock:
+                        self.timeouts_total += 1
+
+    # Resolve a Batch once (a Late Result after a Time Out is Dropped), returning whether this Call Resolved it
+    def _resolve(self, batch_id, batch, results, error_type):
+        with self.watch:
+            if self.watched.pop(batch_id, None) is None:
+                return False
+
+        now = time.perf_counter()
+        with self.lock:
+            self.in_flight -= len(batch)
+            for (_, _, _, enqueued), (_, error) in zip(batch, results):
+                self.requests_total += 1
+                self.errors_total += error is not None
+                self.latencies.append(now - enqueued)
+        self.free_workers.release()
+
+        for (_, _, future, _), (skeleton, error) in zip(batch, results):
+            if error is None:
+                future.set_result(skeleton)
+            else:
+                future.set_exception(error_type(error))
+        return True
+
+    # Snapshot of the Server Metrics (Latencies in Milliseconds)
+    def metrics(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000.0
+            batches_total = self.batches_total
+            snapshot = {
+                "uptime_seconds": round(time.time() - self.start_time, 3),
+                "workers": self.workers,
+                "queue_depth": self.pending.qsize(),
+                "in_flight": self.in_flight,
+                "requests_total": self.requests_total,
+                "errors_total": self.errors_total,
+                "timeouts_total": self.timeouts_total,
+                "batches_total": batches_total,
+                "mean_batch_size": round(self.batched_requests_total / batches_total, 3) if batches_total else 0.0,
+            }
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            snapshot["latency_ms"] = {"p50": round(p50, 3), "p90": round(p90, 3), "p99": round(p99, 3),
+                                      "max": round(float(latencies.max()), 3), "window": len(latencies)}
+        else:
+            snapshot["latency_ms"] = {"p50": None, "p90": None, "p99": None, "max": None, "window": 0}
+        return snapshot
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+        with self.watch:
+            self.closing = True
+            self.watch.notify()
+        self.watchdog.join()
+        self.pool.close()
+        self.pool.join()
+
+
+##__http__##
+
+# Read a Positive Integer Query Parameter
+def positive_int(params, name):
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise ValueError(f"Query parameter {name!r} must be an integer, got {params[name]!r}")
+    if value <= 0:
+        raise ValueError(f"Query parameter {name!r} must be positive, got {value}")
+    return value
+
+# Decode the Request Body into a Binary Mask
+def decode_mask(body, content_type, params):
+    if content_type == "image/png":
+        image = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("Could not decode PNG body")
+        if "resize" in params:
+            side = positive_int(params, "resize")
+            image = cv2.resize(image, (side, side))
+        return binarize(image)
+
+    # Raw Bytes: One uint8 per Pixel in Row-Major Order, any Non-Zero Value is Foreground
+    if "rows" not in params or "cols" not in params:
+        raise ValueError("Raw masks need 'rows' and 'cols' query parameters")
+    rows, cols = positive_int(params, "rows"), positive_int(params, "cols")
+    if len(body) != rows * cols:
+        raise ValueError(f"Expected {rows * cols} bytes for a {rows}x{cols} mask, got {len(body)}")
+    return (np.frombuffer(body, dtype=np.uint8).reshape(rows, cols) > 0).astype(np.int64)
+
+RESPONSE_FORMATS = ("png", "raw")
+
+# Encode a Skeleton for the Response
+def encode_skeleton(skeleton, response_format):
+    if response_format == "raw":
+        return "application/octet-stream", skeleton.astype(np.uint8).tobytes()
+    return "image/png", encode_bilevel_png(skeleton)
+
+class SkeletonisationRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-Alive, so Clients do not pay a Connection per Request
+
+    # The Headers and the Body go out as two Writes, which Nagle's Algorithm would Hold back for a Delayed ACK (~40 ms per Request)
+    def setup(self):
+        self.disable_nagle_algorithm = isinstance(self.client_address, tuple)  # TCP_NODELAY only Applies to TCP Sockets
+        super().setup()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self._send(200, "application/json", json.dumps(self.server.batcher.metrics()).encode())
+        elif path == "/health":
+            self._send(200, "text/plain", b"ok")
+        else:
+            self._send(404, "text/plain", b"not found")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        # Without a Valid Content-Length the Body can neither be Read nor Skipped, so the Connection is Closed after the Error
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send(411, "text/plain", b"Content-Length required", {"Connection": "close"})
+            return
+        try:
+            length = int(length)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self._send(400, "text/plain", f"Invalid Content-Length {length!r}".encode(), {"Connection": "close"})
+            return
+        body = self.rfile.read(length)
+        if url.path != "/skeletonize":
+            self._send(404, "text/plain", b"not found")
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        engine = params.get("engine", DEFAULT_ENGINE)
+        response_format = params.get("format", "png")
+        content_type = self.headers.get("Content-Type", "application/octet-stream").split(";")[0].strip()
+        try:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+            if response_format not in RESPONSE_FORMATS:
+                raise ValueError(f"Unknown format {response_format!r}, expected one of {list(RESPONSE_FORMATS)}")
+            image = decode_mask(body, content_type, params)
+            skeleton = self.server.batcher.submit(image, engine).result()
+            response_type, payload = encode_skeleton(skeleton, response_format)
+        except (ValueError, cv2.error) as error:
+            self._send(400, "text/plain", str(error).encode())
+            return
+        except WorkerTimeoutError as error:
+            self._send(503, "text/plain", str(error).encode())
+            return
+
+        self._send(200, response_type, payload, {"X-Rows": skeleton.shape[0], "X-Cols": skeleton.shape[1]})
+
+    def _send(self, status, content_type, payload, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Unix Socket Clients have no (Host, Port) Address
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+# Create the HTTP Server (TCP on localhost or a Unix Socket) bound to a Batcher
+def create_server(batcher, host="127.0.0.1", port=8765, unix_socket=None, verbose=False):
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, SkeletonisationRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), SkeletonisationRequestHandler)
+        server.daemon_threads = True
+    server.batcher = batcher
+    server.verbose = verbose
+    return server
+
+
+##__main__##
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local image skeletonisation server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Serve on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Batching window in milliseconds")
+    parser.add_argument("--request-timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                        help="Seconds before a batch whose worker has not returned is failed with 503")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    batcher = MicroBatcher(args.workers, max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1000.0,
+                           request_timeout=args.request_timeout)
+    server = create_server(batcher, host=args.host, port=args.port, unix_socket=args.unix, verbose=args.verbose)
+
+    print("Serving on", args.unix or f"http://{args.host}:{args.port}", "with", args.workers, "warm workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)